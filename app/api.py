@@ -1,5 +1,9 @@
-from fastapi import APIRouter
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from app.schemas import UserPayload
+from app import med_stream
 from ml.model import analyze_user
 
 router = APIRouter()
@@ -11,3 +15,113 @@ def health():
 @router.post("/analyze-user")
 def analyze(payload: UserPayload):
     return analyze_user(payload.dict())
+
+
+def _parse_range(header, size):
+    """
+    Parse the first range of a 'bytes=a-b' / 'bytes=a-' / 'bytes=-n' header into inclusive (first, last).
+
+    Returns None when the header should be ignored (other units, bad syntax;
+    RFC 9110 says to answer those with the full file) and raises 416 when
+    the range is valid but does not overlap the file.
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes":
+        return None
+
+    first, dash, last = spec.split(",")[0].strip().partition("-")
+    if not dash or not (first or last) or not all(part.isascii() and part.isdigit() for part in (first, last) if part):
+        return None
+
+    unsatisfiable = HTTPException(status_code=416, headers={"Content-Range": f"bytes */{size}"})
+    if not first:
+        # Suffix range: the last n bytes
+        if int(last) == 0:
+            raise unsatisfiable
+        return max(size - int(last), 0), size - 1
+
+    first = int(first)
+    if last and int(last) < first:
+        return None
+    if first >= size:
+        raise unsatisfiable
+    return first, min(int(last), size - 1) if last else size - 1
+
+
+@router.get("/meditation/{track}")
+def stream_meditation(
+    track: str,
+    request: Request,
+    duration: Optional[float] = Query(None, ge=med_stream.MIN_DURATION_SECONDS, le=3600),
+    format: str = "auto",
+    start: float = Query(0, ge=0),
+    seed: int = Query(med_stream.DEFAULT_SEED, ge=0),
+    bowl_type: str = "tibetan",
+    interval: float = Query(120, ge=10),
+    frequency: float = Query(256, gt=0, le=2000),
+):
+    """
+    Stream a meditation track, rendered block by block as it is sent.
+
+    FLAC/Ogg are encoded on the fly (when soundfile is installed) and seek
+    with `start` (seconds). WAV has a known length, so it also honours HTTP
+    Range requests. The same query always renders the same audio.
+    """
+    if track not in med_stream.TRACKS:
+        raise HTTPException(status_code=404, detail=f"Unknown track '{track}'")
+    if bowl_type not in ("tibetan", "crystal"):
+        raise HTTPException(status_code=422, detail="bowl_type must be 'tibetan' or 'crystal'")
+
+    formats = med_stream.available_formats()
+    audio_format = formats[0] if format == "auto" else format
+    if audio_format not in formats:
+        raise HTTPException(status_code=422, detail=f"format must be one of {['auto'] + formats}")
+
+    if duration is None:
+        duration = med_stream.DEFAULT_DURATIONS[track]
+    if track == "bowl" and duration > med_stream.MAX_BOWL_SECONDS:
+        raise HTTPException(status_code=422, detail=f"bowl duration is limited to {med_stream.MAX_BOWL_SECONDS}s")
+    num_samples = med_stream.track_num_samples(duration)
+
+    if track == "bowl":
+        # Render up front so a failure is an error status, not a truncated stream
+        med_stream.singing_bowl(duration, med_stream.SAMPLE_RATE, frequency, bowl_type, seed)
+
+    def blocks(start_sample):
+        return med_stream.track_blocks(
+            track, duration, start_sample=start_sample, seed=seed,
+            bowl_type=bowl_type, interval=interval, fundamental_freq=frequency,
+        )
+
+    media_type = med_stream.MEDIA_TYPES[audio_format]
+
+    if audio_format != "wav":
+        start_sample = min(int(start * med_stream.SAMPLE_RATE), num_samples)
+        return StreamingResponse(
+            med_stream.encode_compressed(blocks(start_sample), num_samples - start_sample,
+                                         audio_format=audio_format),
+            media_type=media_type,
+            headers={"Accept-Ranges": "none"},
+        )
+
+    size = med_stream.wav_size(num_samples)
+    range_header = request.headers.get("range")
+    byte_range = _parse_range(range_header, size) if range_header else None
+    if byte_range is None:
+        return StreamingResponse(
+            med_stream.encode_wav(blocks, num_samples),
+            media_type=media_type,
+            headers={"Accept-Ranges": "bytes", "Content-Length": str(size)},
+        )
+
+    first, last = byte_range
+    return StreamingResponse(
+        med_stream.encode_wav(blocks, num_samples, first_byte=first, last_byte=last),
+        status_code=206,
+        media_type=media_type,
+        headers={
+            "Accept-Ranges": "bytes",
+            "Content-Range": f"bytes {first}-{last}/{size}",
+            "Content-Length": str(last - first + 1),
+        },
+    )
@@ -0,0 +1,52 @@
+import os
+
+import numpy as np
+
+from config import settings
+
+
+# ==================== SHARED ARRAYS ====================
+
+# Set by app.serve once it has written the assets; worker processes inherit it.
+# Without it, files left in ASSET_DIR by another run (possibly older code) are ignored.
+PREPARED_ENV = "NEULISH_ASSETS_PREPARED"
+
+
+def asset_path(name):
+    return os.path.join(settings.ASSET_DIR, f"{name}.npy")
+
+
+def store_array(name, array):
+    """
+    Write an array to the shared asset directory.
+
+    The file is written under a temporary name and renamed into place, so a
+    worker never maps a half-written file.
+    """
+    os.makedirs(settings.ASSET_DIR, exist_ok=True)
+    path = asset_path(name)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        np.save(f, np.ascontiguousarray(array))
+    os.replace(tmp_path, path)
+    return path
+
+
+def mark_prepared():
+    """Let this process and the workers it starts read the assets just stored"""
+    os.environ[PREPARED_ENV] = "1"
+
+
+def shared_array(name):
+    """
+    Memory-map a stored array read-only, or return None if it was never stored
+    or the assets were not prepared by this server (see mark_prepared).
+
+    Every process mapping the same file shares its pages through the OS page
+    cache, so the array costs its size once, however many workers use it.
+    """
+    path = asset_path(name)
+    if os.environ.get(PREPARED_ENV) != "1" or not os.path.exists(path):
+        return None
+    return np.load(path, mmap_mode="r")
+
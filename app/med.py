@@ -1,12 +1,26 @@
 import numpy as np
 from scipy.io import wavfile
-from scipy import signal
+from scipy.signal import oaconvolve
 import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from app.filters import PinkFilter, bandpass, filter_in_blocks, lowpass
 
 
 # ==================== RAIN SOUND GENERATION ====================
 
-def generate_rain_sound(duration_seconds=900, sample_rate=44100, output_file="gentle_rain.wav"):
+RAIN_BLOCK_SECONDS = 1.0
+RAIN_CHUNK_BLOCKS = 10  # filter state restarts every chunk, the unit of parallel rendering
+RAIN_FADE_IN_SECONDS = 45
+RAIN_FADE_OUT_SECONDS = 60
+
+# Independent random stream per rain layer (see layer_rng)
+RAIN_DROPS, RAIN_PINK, RAIN_RUMBLE, RAIN_SPLASHES = range(4)
+
+
+def generate_rain_sound(duration_seconds=900, sample_rate=44100, output_file="gentle_rain.wav",
+                        seed=None, workers=1):
     """
     Generate a gentle, realistic rain sound for sleep meditation.
 
@@ -14,93 +28,168 @@ def generate_rain_sound(duration_seconds=900, sample_rate=44100, output_file="ge
     - duration_seconds: Length of audio (default 900 = 15 minutes)
     - sample_rate: Audio sample rate (44100 Hz is CD quality)
     - output_file: Name of output WAV file
+    - seed: int, SeedSequence or Generator; the same seed renders the same file
+    - workers: Number of processes to render segments in (output is identical)
     """
 
     print(f"Generating {duration_seconds / 60:.1f} minute rain sound...")
 
-    # Calculate total number of samples
+    rain = render_rain(duration_seconds, sample_rate, seed, workers)
+
+    # Normalize and reduce volume
+    max_val = np.max(np.abs(rain))
+    if max_val > 0:
+        rain = rain / max_val
+    rain = rain * 0.04  # -28dB for background
+
+    # Convert to 16-bit PCM
+    rain_16bit = np.int16(rain * 32767)
+
+    # Save to WAV file
+    wavfile.write(output_file, sample_rate, rain_16bit)
+
+    print(f"✓ Rain sound saved to '{output_file}'")
+
+    return output_file
+
+
+def render_rain(duration_seconds=900, sample_rate=44100, seed=None, workers=1):
+    """
+    Render the rain (before normalization) as a float array, optionally in parallel.
+
+    The track is split into contiguous runs of whole chunks, one per worker.
+    Chunks render independently (see iter_rain_blocks), so the stitched
+    result is bit-identical to a serial render.
+    """
+
+    seed_seq = as_seed_sequence(seed)
     num_samples = int(duration_seconds * sample_rate)
+    block_size = int(RAIN_BLOCK_SECONDS * sample_rate)
+    num_blocks = -(-num_samples // block_size)
+    num_chunks = -(-num_blocks // RAIN_CHUNK_BLOCKS)
 
-    # Initialize empty audio array
-    rain = np.zeros(num_samples)
+    workers = max(1, min(workers, num_chunks))
+    bounds = np.minimum(np.linspace(0, num_chunks, workers + 1).astype(int) * RAIN_CHUNK_BLOCKS, num_blocks)
+    segments = [(duration_seconds, sample_rate, seed_seq, first, stop)
+                for first, stop in zip(bounds[:-1], bounds[1:])]
 
-    # LAYER 1: Individual raindrops (random impulses)
-    drop_density = 0.003  # Probability of raindrop per sample (gentle rain)
-    drop_positions = np.random.random(num_samples) < drop_density
-    drop_amplitudes = np.random.random(num_samples) * 0.15
+    if workers == 1:
+        return render_rain_segment(*segments[0])
 
-    raindrops = drop_positions * drop_amplitudes
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        parts = list(pool.map(render_rain_segment, *zip(*segments)))
+    return np.concatenate(parts)
 
-    # Apply short decay envelope to each raindrop
-    decay_length = int(0.02 * sample_rate)  # 20ms decay
-    decay_env = np.exp(-np.linspace(0, 5, decay_length))
-    raindrops = np.convolve(raindrops, decay_env, mode='same')
 
-    rain += raindrops
+def render_rain_segment(duration_seconds, sample_rate, seed, first_block, stop_block):
+    """Rain blocks first_block..stop_block-1 as one array"""
+    blocks = iter_rain_blocks(duration_seconds, sample_rate, seed, first_block)
+    return np.concatenate(list(islice(blocks, stop_block - first_block)))
 
-    # LAYER 2: Pink noise (continuous rainfall texture)
-    white_noise = np.random.randn(num_samples)
-    pink_noise = apply_pink_filter(white_noise)
-    pink_noise = pink_noise * 0.08
 
-    rain += pink_noise
+def iter_rain_blocks(duration_seconds=900, sample_rate=44100, seed=None, first_block=0):
+    """
+    Render the rain block by block (before normalization), starting at first_block.
 
-    # LAYER 3: Low rumble (distant rain on roof/ground)
-    rumble_freq = 0.5  # Hz
-    t = np.linspace(0, duration_seconds, num_samples)
-    rumble = np.sin(2 * np.pi * rumble_freq * t) * 0.03
-    rumble += np.random.randn(num_samples) * 0.02
-    rumble = apply_lowpass_filter(rumble, cutoff=200, sample_rate=sample_rate)
+    Blocks are grouped into chunks of RAIN_CHUNK_BLOCKS. Each chunk starts
+    from fresh filter state, settled by rendering and discarding the block
+    before it, so a chunk's output only depends on the seed and its index.
+    Starting mid-chunk renders from the start of that chunk.
+    """
 
-    rain += rumble
+    seed_seq = as_seed_sequence(seed)
+    num_samples = int(duration_seconds * sample_rate)
+    block_size = int(RAIN_BLOCK_SECONDS * sample_rate)
+    num_blocks = -(-num_samples // block_size)
 
-    # LAYER 4: Gentle splashes
-    splash_density = 0.0005
-    splash_positions = np.random.random(num_samples) < splash_density
-    splash_amplitudes = np.random.random(num_samples) * 0.25
+    for chunk_start in range(first_block - first_block % RAIN_CHUNK_BLOCKS, num_blocks, RAIN_CHUNK_BLOCKS):
+        chunk_stop = min(chunk_start + RAIN_CHUNK_BLOCKS, num_blocks)
+        for block, rain in _render_rain_chunk(seed_seq, num_samples, sample_rate, block_size,
+                                              chunk_start, chunk_stop):
+            if block >= first_block:
+                yield rain
 
-    splashes = splash_positions * splash_amplitudes
-    splash_decay_length = int(0.08 * sample_rate)
-    splash_decay = np.exp(-np.linspace(0, 4, splash_decay_length))
-    splashes = np.convolve(splashes, splash_decay, mode='same')
 
-    rain += splashes
+def _render_rain_chunk(seed_seq, num_samples, sample_rate, block_size, first_block, stop_block):
+    """Yield (block, rain) for one chunk, after a warm-up block from fresh state"""
 
-    # Apply gentle fade in (45 seconds)
-    fade_in_samples = int(45 * sample_rate)
-    fade_in = np.linspace(0, 1, fade_in_samples)
-    rain[:fade_in_samples] *= fade_in
+    # Short decay envelopes for raindrops (20ms) and splashes (80ms)
+    drop_decay = np.exp(-np.linspace(0, 5, int(0.02 * sample_rate)))
+    splash_decay = np.exp(-np.linspace(0, 4, int(0.08 * sample_rate)))
+    drop_tail = np.zeros(len(drop_decay) - 1)
+    splash_tail = np.zeros(len(splash_decay) - 1)
 
-    # Apply gentle fade out (60 seconds)
-    fade_out_samples = int(60 * sample_rate)
-    fade_out = np.linspace(1, 0, fade_out_samples)
-    rain[-fade_out_samples:] *= fade_out
+    pink_filter = PinkFilter()
+    rumble_filter = lowpass(200, sample_rate)
+    band_filter = bandpass(100, 8000, sample_rate)
 
-    # Apply bandpass filter
-    rain = apply_bandpass_filter(rain, low=100, high=8000, sample_rate=sample_rate)
+    for block in range(max(first_block - 1, 0), stop_block):
+        start = block * block_size
+        n = min(block_size, num_samples - start)
+        idx = np.arange(start, start + n)
 
-    # Normalize and reduce volume
-    max_val = np.max(np.abs(rain))
-    if max_val > 0:
-        rain = rain / max_val
-    rain = rain * 0.04  # -28dB for background
+        # LAYER 1: Individual raindrops (random impulses, gentle rain density)
+        drops_rng = layer_rng(seed_seq, RAIN_DROPS, block)
+        raindrops = (drops_rng.random(n) < 0.003) * drops_rng.random(n) * 0.15
+        raindrops = oaconvolve(raindrops, drop_decay)
+        raindrops[:len(drop_tail)] += drop_tail
+        drop_tail = raindrops[n:]
+        rain = raindrops[:n]
 
-    # Convert to 16-bit PCM
-    rain_16bit = np.int16(rain * 32767)
+        # LAYER 2: Pink noise (continuous rainfall texture)
+        rain += pink_filter(layer_rng(seed_seq, RAIN_PINK, block).standard_normal(n)) * 0.08
 
-    # Save to WAV file
-    wavfile.write(output_file, sample_rate, rain_16bit)
+        # LAYER 3: Low rumble (distant rain on roof/ground)
+        rumble = np.sin(2 * np.pi * 0.5 * idx / sample_rate) * 0.03
+        rumble += layer_rng(seed_seq, RAIN_RUMBLE, block).standard_normal(n) * 0.02
+        rain += rumble_filter(rumble)
 
-    print(f"✓ Rain sound saved to '{output_file}'")
+        # LAYER 4: Gentle splashes
+        splash_rng = layer_rng(seed_seq, RAIN_SPLASHES, block)
+        splashes = (splash_rng.random(n) < 0.0005) * splash_rng.random(n) * 0.25
+        splashes = oaconvolve(splashes, splash_decay)
+        splashes[:len(splash_tail)] += splash_tail
+        splash_tail = splashes[n:]
+        rain += splashes[:n]
 
-    return output_file
+        # Gentle fade in (45 seconds) and fade out (60 seconds)
+        rain *= rain_fade(idx, num_samples, sample_rate)
+
+        rain = band_filter(rain)
+
+        if block >= first_block:
+            yield block, rain
+
+
+def rain_fade(idx, num_samples, sample_rate=44100):
+    """Fade in/out envelope of the rain at sample indices idx"""
+    fade_in_samples = int(RAIN_FADE_IN_SECONDS * sample_rate)
+    fade_out_samples = int(RAIN_FADE_OUT_SECONDS * sample_rate)
+    return (np.clip(idx / fade_in_samples, 0, 1)
+            * np.clip((num_samples - 1 - idx) / (fade_out_samples - 1), 0, 1))
+
+
+def rain_fade_peak(num_samples, sample_rate=44100):
+    """
+    Highest value of rain_fade. It is 1 unless the fades overlap (tracks
+    shorter than about 105s), where the rain never reaches full level.
+    """
+
+    # Product of two ramps: the peak is where a ramp ends or at the midpoint
+    fade_in_end = int(RAIN_FADE_IN_SECONDS * sample_rate)
+    fade_out_start = num_samples - int(RAIN_FADE_OUT_SECONDS * sample_rate)
+    midpoint = (num_samples - 1) // 2
+    candidates = np.clip([fade_in_end, fade_out_start, midpoint, midpoint + 1], 0, max(num_samples - 1, 0))
+    return float(np.max(rain_fade(candidates, num_samples, sample_rate)))
 
 
 # ==================== SINGING BOWL GENERATION ====================
 
+BOWL_SHIMMER = 0
+
 def generate_singing_bowl(duration_seconds=30, sample_rate=44100,
                           fundamental_freq=256, bowl_type="tibetan",
-                          output_file="singing_bowl.wav"):
+                          output_file="singing_bowl.wav", seed=None):
     """
     Generate a realistic singing bowl sound with natural harmonics and decay.
 
@@ -110,10 +199,37 @@ def generate_singing_bowl(duration_seconds=30, sample_rate=44100,
     - fundamental_freq: Base frequency (C4=256Hz, D4=293Hz, E4=330Hz, etc.)
     - bowl_type: "tibetan" (warmer, more harmonics) or "crystal" (purer, clearer)
     - output_file: Name of output WAV file
+    - seed: int, SeedSequence or Generator for the shimmer noise
     """
 
     print(f"Generating {bowl_type} singing bowl at {fundamental_freq}Hz...")
 
+    bowl = render_singing_bowl(duration_seconds, sample_rate, fundamental_freq, bowl_type, seed)
+
+    # Convert to 16-bit PCM
+    bowl_16bit = np.int16(bowl * 32767)
+
+    # Save to WAV file
+    wavfile.write(output_file, sample_rate, bowl_16bit)
+
+    print(f"✓ Singing bowl saved to '{output_file}'")
+
+    return output_file
+
+
+def render_singing_bowl(duration_seconds=30, sample_rate=44100,
+                        fundamental_freq=256, bowl_type="tibetan", seed=None):
+    """
+    Render a singing bowl as a float array in [-1, 1] (returns array, not file).
+
+    Parameters:
+    - duration_seconds: Length of the bowl sound
+    - sample_rate: Audio sample rate
+    - fundamental_freq: Base frequency (C4=256Hz, D4=293Hz, E4=330Hz, etc.)
+    - bowl_type: "tibetan" or "crystal"
+    - seed: int, SeedSequence or Generator for the shimmer noise
+    """
+
     num_samples = int(duration_seconds * sample_rate)
     t = np.linspace(0, duration_seconds, num_samples)
 
@@ -167,12 +283,12 @@ def generate_singing_bowl(duration_seconds=30, sample_rate=44100,
         bowl += harmonic_wave * decay_envelope
 
     # Add subtle noise for realism (the "shimmer")
-    noise = np.random.randn(num_samples) * 0.005
+    noise = block_noise(seed, BOWL_SHIMMER, num_samples, sample_rate) * 0.005
     noise_envelope = np.exp(-8 * t / duration_seconds)
     bowl += noise * noise_envelope
 
     # Apply gentle attack (initial strike)
-    attack_samples = int(0.05 * sample_rate)  # 50ms attack
+    attack_samples = min(int(0.05 * sample_rate), num_samples)  # 50ms attack
     attack_env = np.linspace(0, 1, attack_samples)
     bowl[:attack_samples] *= attack_env
 
@@ -191,15 +307,19 @@ def generate_singing_bowl(duration_seconds=30, sample_rate=44100,
     # Apply gentle compression for smoothness
     bowl = np.tanh(bowl * 1.2) * 0.8
 
-    # Convert to 16-bit PCM
-    bowl_16bit = np.int16(bowl * 32767)
+    return bowl
 
-    # Save to WAV file
-    wavfile.write(output_file, sample_rate, bowl_16bit)
 
-    print(f"✓ Singing bowl saved to '{output_file}'")
+# Strike patterns of a bowl sequence
+SEQUENCE_FREQUENCIES = {
+    "tibetan": [256, 288, 320, 256, 288],  # C, D, E pattern
+    "crystal": [256, 384, 512, 256, 384],  # C, G, C octave pattern
+}
 
-    return output_file
+
+def sequence_bowl_duration(interval):
+    """Bowl length in a sequence: long decay, cut 5s before the next strike so bowls never overlap"""
+    return min(45, interval - 5)
 
 
 def generate_bowl_sequence(total_duration=900, interval=120, sample_rate=44100,
@@ -220,11 +340,8 @@ def generate_bowl_sequence(total_duration=900, interval=120, sample_rate=44100,
     num_samples = int(total_duration * sample_rate)
     sequence = np.zeros(num_samples)
 
-    # Define a set of complementary frequencies (healing frequencies)
-    if bowl_type == "tibetan":
-        frequencies = [256, 288, 320, 256, 288]  # C, D, E pattern
-    else:  # crystal
-        frequencies = [256, 384, 512, 256, 384]  # C, G, C octave pattern
+    # Complementary frequencies (healing frequencies); anything but tibetan is crystal
+    frequencies = SEQUENCE_FREQUENCIES["tibetan" if bowl_type == "tibetan" else "crystal"]
 
     # Place bowls at intervals
     bowl_times = np.arange(0, total_duration, interval)
@@ -234,7 +351,7 @@ def generate_bowl_sequence(total_duration=900, interval=120, sample_rate=44100,
         freq = frequencies[i % len(frequencies)]
 
         # Generate individual bowl
-        bowl_duration = min(45, interval - 5)  # Long decay, but don't overlap much
+        bowl_duration = sequence_bowl_duration(interval)
         bowl = generate_single_bowl(
             duration=bowl_duration,
             frequency=freq,
@@ -304,7 +421,7 @@ def generate_single_bowl(duration, frequency, sample_rate, bowl_type):
         bowl += harmonic_wave * decay_envelope
 
     # Attack envelope
-    attack_samples = int(0.05 * sample_rate)
+    attack_samples = min(int(0.05 * sample_rate), num_samples)
     attack_env = np.linspace(0, 1, attack_samples)
     bowl[:attack_samples] *= attack_env
 
@@ -318,33 +435,54 @@ def generate_single_bowl(duration, frequency, sample_rate, bowl_type):
 
 # ==================== HELPER FUNCTIONS ====================
 
+def as_seed_sequence(seed=None):
+    """
+    Resolve a seed into the SeedSequence all random streams are derived from.
+
+    Accepts None (fresh entropy), an int, a SeedSequence or a Generator
+    (one value is drawn from it, so successive calls differ).
+    """
+    if isinstance(seed, np.random.SeedSequence):
+        return seed
+    if isinstance(seed, np.random.Generator):
+        return np.random.SeedSequence(int(seed.integers(2 ** 63)))
+    return np.random.SeedSequence(seed)
+
+
+def layer_rng(seed_seq, layer, block):
+    """
+    Generator for one layer of one time block.
+
+    Streams are addressed by (layer, block) spawn keys, so any block can be
+    rendered on its own, in any order or process, and draw the same numbers.
+    """
+    return np.random.default_rng(np.random.SeedSequence(
+        seed_seq.entropy, spawn_key=seed_seq.spawn_key + (layer, block)))
+
+
+def block_noise(seed, layer, num_samples, block_size):
+    """White noise for one layer, drawn block by block from layer_rng streams"""
+    seed_seq = as_seed_sequence(seed)
+    noise = np.empty(num_samples)
+    for block, start in enumerate(range(0, num_samples, block_size)):
+        n = min(block_size, num_samples - start)
+        noise[start:start + n] = layer_rng(seed_seq, layer, block).standard_normal(n)
+    return noise
+
+
 def apply_pink_filter(white_noise):
-    """Convert white noise to pink noise using FFT"""
-    fft = np.fft.rfft(white_noise)
-    frequencies = np.fft.rfftfreq(len(white_noise))
-    frequencies[0] = 1  # Avoid division by zero
-    pink_spectrum = fft / np.sqrt(frequencies)
-    pink_noise = np.fft.irfft(pink_spectrum, n=len(white_noise))
-    return pink_noise
+    """Convert white noise to pink noise with an IIR filter (see PinkFilter)"""
+    return filter_in_blocks(PinkFilter(), white_noise)
 
 
 def apply_lowpass_filter(audio, cutoff=200, sample_rate=44100):
     """Apply low-pass filter to keep only low frequencies"""
-    nyquist = sample_rate / 2
-    normalized_cutoff = cutoff / nyquist
-    b, a = signal.butter(4, normalized_cutoff, btype='low')
-    filtered = signal.filtfilt(b, a, audio)
-    return filtered
+    return lowpass(cutoff, sample_rate)(audio)
 
 
 def apply_bandpass_filter(audio, low=100, high=8000, sample_rate=44100):
     """Apply band-pass filter to keep frequencies in specified range"""
-    nyquist = sample_rate / 2
-    normalized_low = low / nyquist
-    normalized_high = high / nyquist
-    b, a = signal.butter(3, [normalized_low, normalized_high], btype='band')
-    filtered = signal.filtfilt(b, a, audio)
-    return filtered
+    return bandpass(low, high, sample_rate)(audio)
 
 
 def combine_audio_files(file1, file2, output_file, volume1=1.0, volume2=1.0):
@@ -406,15 +544,21 @@ def combine_audio_files(file1, file2, output_file, volume1=1.0, volume2=1.0):
 
 # ==================== MAIN GENERATION FUNCTIONS ====================
 
-def generate_complete_meditation_set():
+def generate_complete_meditation_set(seed=None, workers=1):
     """
     Generate a complete set of meditation sounds:
     - Rain backgrounds for different durations
     - Individual singing bowls
     - Bowl sequences
     - Combined rain + bowl tracks
+
+    Each noisy track gets its own child of seed, so a seeded run always
+    produces the same files. workers is passed on to generate_rain_sound.
     """
 
+    # Spawned one at a time, so adding a track needs no count kept in sync
+    seed_seq = as_seed_sequence(seed)
+
     print("\n" + "=" * 60)
     print("MEDITATION SOUND GENERATION SUITE")
     print("=" * 60 + "\n")
@@ -426,29 +570,33 @@ def generate_complete_meditation_set():
     # ===== RAIN SOUNDS =====
     print("\n--- GENERATING RAIN SOUNDS ---\n")
 
-    rain_5min = generate_rain_sound(300, output_file="rain_5min.wav")
-    rain_7min = generate_rain_sound(420, output_file="rain_7min.wav")
-    rain_9min = generate_rain_sound(540, output_file="rain_9min.wav")
-    rain_15min = generate_rain_sound(900, output_file="rain_15min.wav")
+    rain_5min = generate_rain_sound(300, output_file="rain_5min.wav",
+                                    seed=seed_seq.spawn(1)[0], workers=workers)
+    rain_7min = generate_rain_sound(420, output_file="rain_7min.wav",
+                                    seed=seed_seq.spawn(1)[0], workers=workers)
+    rain_9min = generate_rain_sound(540, output_file="rain_9min.wav",
+                                    seed=seed_seq.spawn(1)[0], workers=workers)
+    rain_15min = generate_rain_sound(900, output_file="rain_15min.wav",
+                                     seed=seed_seq.spawn(1)[0], workers=workers)
 
     # ===== SINGING BOWLS =====
     print("\n--- GENERATING SINGING BOWLS ---\n")
 
     # Tibetan bowls at different frequencies
     generate_singing_bowl(30, fundamental_freq=256, bowl_type="tibetan",
-                          output_file="tibetan_bowl_C.wav")
+                          output_file="tibetan_bowl_C.wav", seed=seed_seq.spawn(1)[0])
     generate_singing_bowl(30, fundamental_freq=288, bowl_type="tibetan",
-                          output_file="tibetan_bowl_D.wav")
+                          output_file="tibetan_bowl_D.wav", seed=seed_seq.spawn(1)[0])
     generate_singing_bowl(30, fundamental_freq=320, bowl_type="tibetan",
-                          output_file="tibetan_bowl_E.wav")
+                          output_file="tibetan_bowl_E.wav", seed=seed_seq.spawn(1)[0])
 
     # Crystal bowls at different frequencies
     generate_singing_bowl(30, fundamental_freq=256, bowl_type="crystal",
-                          output_file="crystal_bowl_C.wav")
+                          output_file="crystal_bowl_C.wav", seed=seed_seq.spawn(1)[0])
     generate_singing_bowl(30, fundamental_freq=384, bowl_type="crystal",
-                          output_file="crystal_bowl_G.wav")
+                          output_file="crystal_bowl_G.wav", seed=seed_seq.spawn(1)[0])
     generate_singing_bowl(30, fundamental_freq=512, bowl_type="crystal",
-                          output_file="crystal_bowl_C_high.wav")
+                          output_file="crystal_bowl_C_high.wav", seed=seed_seq.spawn(1)[0])
 
     # ===== BOWL SEQUENCES =====
     print("\n--- GENERATING BOWL SEQUENCES ---\n")
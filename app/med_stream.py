@@ -0,0 +1,372 @@
+import struct
+from functools import lru_cache
+
+import numpy as np
+
+from app.assets import shared_array, store_array
+from app.med import (
+    RAIN_BLOCK_SECONDS, SEQUENCE_FREQUENCIES, generate_single_bowl, iter_rain_blocks, rain_fade_peak,
+    render_singing_bowl, sequence_bowl_duration,
+)
+
+try:
+    import soundfile as sf
+except ImportError:  # soundfile is optional; fall back to plain WAV
+    sf = None
+
+
+# ==================== STREAMING SETTINGS ====================
+
+SAMPLE_RATE = 44100
+BLOCK_SECONDS = RAIN_BLOCK_SECONDS
+DEFAULT_SEED = 0
+
+TRACKS = ("rain", "bowl", "sequence", "mix")
+DEFAULT_DURATIONS = {"rain": 900, "bowl": 30, "sequence": 900, "mix": 900}
+MIN_DURATION_SECONDS = 1
+MAX_BOWL_SECONDS = 120  # a single bowl is rendered whole, then streamed
+
+MEDIA_TYPES = {"flac": "audio/flac", "ogg": "audio/ogg", "wav": "audio/wav"}
+
+# generate_rain_sound peak-normalizes the whole track to 0.04, which a stream
+# can't do. Once the fades are done its pre-normalization peak sits around
+# 1.75-1.9, so streams scale by that and by the fade envelope's peak instead.
+RAIN_LEVEL = 0.04
+RAIN_PEAK = 1.85
+
+
+def available_formats():
+    """Encodings this server can produce, best first"""
+    if sf is None:
+        return ["wav"]
+    return ["ogg", "flac", "wav"]
+
+
+def track_num_samples(duration_seconds, sample_rate=SAMPLE_RATE):
+    """Number of samples a track renders to"""
+    return int(duration_seconds * sample_rate)
+
+
+# ==================== BLOCK RENDERERS ====================
+
+def rain_blocks(duration_seconds=900, sample_rate=SAMPLE_RATE, seed=DEFAULT_SEED, first_block=0):
+    """
+    Rain track of generate_rain_sound, block by block (see iter_rain_blocks).
+
+    Blocks are seeded by (seed, layer, block) and filter state restarts every
+    chunk, so a seek re-renders exactly the samples a full stream would send.
+    """
+
+    fade_peak = rain_fade_peak(track_num_samples(duration_seconds, sample_rate), sample_rate)
+    gain = RAIN_LEVEL / (RAIN_PEAK * fade_peak) if fade_peak > 0 else 0
+    for block in iter_rain_blocks(duration_seconds, sample_rate, seed, first_block):
+        yield np.clip(block * gain, -1, 1)
+
+
+def _bowl_table_name(duration, frequency, sample_rate, bowl_type):
+    return f"bowl_table_{bowl_type}_{frequency:g}hz_{duration:g}s_{sample_rate}"
+
+
+def _singing_bowl_name(duration_seconds, sample_rate, fundamental_freq, bowl_type):
+    return f"singing_bowl_{bowl_type}_{fundamental_freq:g}hz_{duration_seconds:g}s_{sample_rate}"
+
+
+@lru_cache(maxsize=8)
+def _bowl_table(duration, frequency, sample_rate, bowl_type):
+    """generate_single_bowl output, memory-mapped from the shared assets when prepared"""
+    bowl = shared_array(_bowl_table_name(duration, frequency, sample_rate, bowl_type))
+    if bowl is None:
+        bowl = generate_single_bowl(duration, frequency, sample_rate, bowl_type)
+        bowl.setflags(write=False)
+    return bowl
+
+
+def sequence_blocks(duration_seconds=900, sample_rate=SAMPLE_RATE, interval=120,
+                    bowl_type="tibetan", first_block=0):
+    """
+    Render the bowl sequence of generate_bowl_sequence block by block.
+
+    Strikes never overlap (each bowl is cut 5s before the next strike) and
+    every bowl is normalized, so the sequence peak is known up front and no
+    whole-track normalization pass is needed.
+    """
+
+    num_samples = track_num_samples(duration_seconds, sample_rate)
+    block_size = int(BLOCK_SECONDS * sample_rate)
+    num_blocks = -(-num_samples // block_size)
+
+    frequencies = SEQUENCE_FREQUENCIES[bowl_type]
+
+    strike_starts = [int(t * sample_rate) for t in np.arange(0, duration_seconds, interval)]
+    bowl_duration = sequence_bowl_duration(interval)
+    bowl_length = int(bowl_duration * sample_rate)
+
+    for block in range(first_block, num_blocks):
+        start = block * block_size
+        end = min(start + block_size, num_samples)
+        out = np.zeros(end - start)
+
+        for i, strike in enumerate(strike_starts):
+            lo = max(start, strike)
+            hi = min(end, strike + bowl_length)
+            if lo < hi:
+                bowl = _bowl_table(bowl_duration, frequencies[i % len(frequencies)], sample_rate, bowl_type)
+                out[lo - start:hi - start] += bowl[lo - strike:hi - strike]
+
+        yield out * 0.6
+
+
+@lru_cache(maxsize=8)
+def singing_bowl(duration_seconds, sample_rate, fundamental_freq, bowl_type, seed):
+    """Single bowl of the bowl track, rendered whole and cached"""
+    bowl = None
+    if seed == DEFAULT_SEED:
+        bowl = shared_array(_singing_bowl_name(duration_seconds, sample_rate, fundamental_freq, bowl_type))
+    if bowl is None:
+        bowl = render_singing_bowl(duration_seconds, sample_rate, fundamental_freq, bowl_type, seed)
+        bowl.setflags(write=False)
+    return bowl
+
+
+def bowl_blocks(duration_seconds=30, sample_rate=SAMPLE_RATE, fundamental_freq=256,
+                bowl_type="tibetan", seed=DEFAULT_SEED, first_block=0):
+    """Single singing bowl (see generate_singing_bowl), cut into blocks"""
+
+    bowl = singing_bowl(duration_seconds, sample_rate, fundamental_freq, bowl_type, seed)
+    block_size = int(BLOCK_SECONDS * sample_rate)
+
+    for start in range(first_block * block_size, len(bowl), block_size):
+        yield bowl[start:start + block_size]
+
+
+def mix_blocks(duration_seconds=900, sample_rate=SAMPLE_RATE, interval=120,
+               bowl_type="tibetan", seed=DEFAULT_SEED, first_block=0):
+    """Rain + bowl sequence at the volumes combine_audio_files uses"""
+
+    rain = rain_blocks(duration_seconds, sample_rate, seed, first_block)
+    bowls = sequence_blocks(duration_seconds, sample_rate, interval, bowl_type, first_block)
+
+    for rain_block, bowl_block in zip(rain, bowls):
+        yield np.clip(rain_block * 0.7 + bowl_block * 0.5, -0.95, 0.95)
+
+
+def track_blocks(track, duration_seconds, sample_rate=SAMPLE_RATE, start_sample=0,
+                 seed=DEFAULT_SEED, bowl_type="tibetan", interval=120, fundamental_freq=256):
+    """
+    Float blocks for a track, starting exactly at start_sample.
+
+    Parameters:
+    - track: One of TRACKS
+    - duration_seconds: Length of the track
+    - start_sample: First sample to yield (for seeking)
+    - seed: Noise seed; the same parameters always render the same audio
+    """
+
+    block_size = int(BLOCK_SECONDS * sample_rate)
+    first_block, skip = divmod(start_sample, block_size)
+
+    if track == "rain":
+        blocks = rain_blocks(duration_seconds, sample_rate, seed, first_block)
+    elif track == "bowl":
+        blocks = bowl_blocks(duration_seconds, sample_rate, fundamental_freq, bowl_type, seed, first_block)
+    elif track == "sequence":
+        blocks = sequence_blocks(duration_seconds, sample_rate, interval, bowl_type, first_block)
+    elif track == "mix":
+        blocks = mix_blocks(duration_seconds, sample_rate, interval, bowl_type, seed, first_block)
+    else:
+        raise ValueError(f"Unknown track '{track}'")
+
+    for block in blocks:
+        if skip:
+            block = block[skip:]
+            skip = 0
+        yield block
+
+
+# ==================== SHARED ASSETS ====================
+
+def prepare_shared_assets(sample_rate=SAMPLE_RATE):
+    """
+    Render the bowl tables of the default sequences and the default single
+    bowls into the shared asset directory (see app.assets).
+
+    Run once by the server process before workers start; workers then
+    memory-map them instead of each rendering a private copy. Other
+    parameters still render per worker on first use.
+    """
+
+    bowl_duration = sequence_bowl_duration(120)
+    for bowl_type, frequencies in SEQUENCE_FREQUENCIES.items():
+        for frequency in sorted(set(frequencies)):
+            store_array(_bowl_table_name(bowl_duration, frequency, sample_rate, bowl_type),
+                        generate_single_bowl(bowl_duration, frequency, sample_rate, bowl_type))
+
+        duration = DEFAULT_DURATIONS["bowl"]
+        store_array(_singing_bowl_name(duration, sample_rate, 256, bowl_type),
+                    render_singing_bowl(duration, sample_rate, 256, bowl_type, DEFAULT_SEED))
+
+
+# ==================== ENCODERS ====================
+
+def wav_header(num_samples, sample_rate=SAMPLE_RATE):
+    """44-byte header of a mono 16-bit PCM WAV file"""
+    data_size = num_samples * 2
+    return struct.pack(
+        "<4sI4s4sIHHIIHH4sI",
+        b"RIFF", 36 + data_size, b"WAVE",
+        b"fmt ", 16, 1, 1, sample_rate, sample_rate * 2, 2, 16,
+        b"data", data_size,
+    )
+
+
+def wav_size(num_samples):
+    return 44 + num_samples * 2
+
+
+def to_pcm16(block):
+    """Same conversion the file generators use"""
+    return np.int16(block * 32767)
+
+
+def encode_wav(block_factory, num_samples, sample_rate=SAMPLE_RATE, first_byte=0, last_byte=None):
+    """
+    Yield bytes first_byte..last_byte (inclusive) of the WAV file.
+
+    block_factory(start_sample) must return float blocks starting at that sample,
+    so a byte range only renders the samples it covers.
+    """
+
+    if last_byte is None:
+        last_byte = wav_size(num_samples) - 1
+    remaining = last_byte - first_byte + 1
+
+    header = wav_header(num_samples, sample_rate)
+    if first_byte < len(header):
+        chunk = header[first_byte:first_byte + remaining]
+        remaining -= len(chunk)
+        yield chunk
+        start_sample, skip = 0, 0
+    else:
+        start_sample, skip = divmod(first_byte - len(header), 2)
+
+    if remaining <= 0:
+        return
+
+    for block in block_factory(start_sample):
+        chunk = to_pcm16(block).tobytes()
+        if skip:
+            chunk = chunk[skip:]
+            skip = 0
+        chunk = chunk[:remaining]
+        remaining -= len(chunk)
+        yield chunk
+        if remaining <= 0:
+            return
+
+
+class _StreamSink:
+    """
+    Write-only file object for soundfile that hands out bytes as they are written.
+
+    libsndfile seeks back at close to patch header fields (e.g. the FLAC
+    sample count and MD5); those rewrites land in bytes already sent and are
+    dropped, so encode_compressed fills in what readers need up front.
+    """
+
+    def __init__(self):
+        self._pending = bytearray()
+        self._sent = 0
+        self._pos = 0
+        self._size = 0
+
+    def write(self, data):
+        data = bytes(data)
+        written = len(data)
+        pos = self._pos
+        if pos < self._sent:
+            data = data[self._sent - pos:]
+            pos = self._sent
+        offset = pos - self._sent
+        if offset > len(self._pending):
+            self._pending.extend(b"\0" * (offset - len(self._pending)))
+        self._pending[offset:offset + len(data)] = data
+        self._pos += written
+        self._size = max(self._size, self._pos)
+        return written
+
+    def seek(self, offset, whence=0):
+        if whence == 1:
+            offset += self._pos
+        elif whence == 2:
+            offset += self._size
+        self._pos = offset
+        return self._pos
+
+    def tell(self):
+        return self._pos
+
+    def take(self):
+        """Bytes written since the last call"""
+        data = bytes(self._pending)
+        self._sent += len(data)
+        self._pending.clear()
+        return data
+
+
+def _set_flac_total_samples(header, num_samples):
+    """
+    Write the sample count into a FLAC STREAMINFO block.
+
+    libsndfile only fills it in by seeking back at close, which a stream
+    can't do, and leaves 0 ("unknown") otherwise; libsndfile itself then
+    fails to read the file to the end. The MD5 stays 0, which readers
+    treat as "not computed".
+    """
+    header = bytearray(header)
+    # 'fLaC' + block header, then STREAMINFO: 10 bytes of block/frame sizes, then
+    # 20 bits sample rate, 3 bits channels, 5 bits sample size, 36 bits total samples
+    packed = struct.unpack(">Q", header[18:26])[0]
+    packed = (packed & ~((1 << 36) - 1)) | num_samples
+    header[18:26] = struct.pack(">Q", packed)
+    return bytes(header)
+
+
+def encode_compressed(blocks, num_samples, sample_rate=SAMPLE_RATE, audio_format="flac"):
+    """
+    Encode float blocks to FLAC or Ogg Vorbis with soundfile, yielding bytes as produced.
+
+    num_samples is the number of samples the blocks add up to; FLAC stores
+    it in its header, which goes out before the audio is rendered.
+    """
+
+    if sf is None:
+        raise RuntimeError("soundfile is not installed; only WAV streaming is available")
+
+    if audio_format == "flac":
+        format_args = {"format": "FLAC", "subtype": "PCM_16"}
+    elif audio_format == "ogg":
+        format_args = {"format": "OGG", "subtype": "VORBIS"}
+    else:
+        raise ValueError(f"Unsupported compressed format '{audio_format}'")
+
+    sink = _StreamSink()
+    header_sent = False
+
+    def take():
+        nonlocal header_sent
+        data = sink.take()
+        if data and not header_sent:
+            header_sent = True
+            if audio_format == "flac":
+                data = _set_flac_total_samples(data, num_samples)
+        return data
+
+    with sf.SoundFile(sink, mode="w", samplerate=sample_rate, channels=1, **format_args) as out:
+        for block in blocks:
+            out.write(to_pcm16(block))
+            data = take()
+            if data:
+                yield data
+    data = take()
+    if data:
+        yield data
@@ -0,0 +1,23 @@
+"""
+Run the API with several worker processes sharing read-only assets.
+
+Usage: python -m app.serve   (worker count from WEB_CONCURRENCY, see config/settings.py)
+"""
+import uvicorn
+
+from app.assets import mark_prepared
+from app.med_stream import prepare_shared_assets
+from config import settings
+
+
+def main():
+    # Build shared assets once, before any worker starts, so workers only map them.
+    # Each file is replaced atomically, so instances already mapping them are unaffected.
+    prepare_shared_assets()
+    mark_prepared()
+
+    uvicorn.run("app.main:app", host=settings.HOST, port=settings.PORT, workers=settings.WORKERS)
+
+
+if __name__ == "__main__":
+    main()
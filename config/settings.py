@@ -0,0 +1,16 @@
+import os
+import tempfile
+
+# ==================== SERVER ====================
+
+HOST = os.getenv("HOST", "0.0.0.0")
+PORT = int(os.getenv("PORT", "8000"))
+
+# Number of uvicorn worker processes (WEB_CONCURRENCY is what Render and gunicorn use)
+WORKERS = int(os.getenv("WEB_CONCURRENCY", "1"))
+
+# ==================== SHARED ASSETS ====================
+
+# Read-only assets are written here once by the server process and
+# memory-mapped by every worker, so N workers hold one copy between them.
+ASSET_DIR = os.getenv("NEULISH_ASSET_DIR", os.path.join(tempfile.gettempdir(), "neulish-assets"))
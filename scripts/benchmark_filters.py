@@ -0,0 +1,71 @@
+"""
+Benchmark the app.filters helpers against the previous filtfilt / FFT helpers.
+
+Usage: python -m scripts.benchmark_filters [duration_seconds]
+"""
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+from scipy import signal
+
+from app.med import apply_bandpass_filter, apply_lowpass_filter, apply_pink_filter
+
+
+# ==================== PREVIOUS IMPLEMENTATIONS ====================
+
+def legacy_pink_filter(white_noise):
+    fft = np.fft.rfft(white_noise)
+    frequencies = np.fft.rfftfreq(len(white_noise))
+    frequencies[0] = 1
+    pink_spectrum = fft / np.sqrt(frequencies)
+    return np.fft.irfft(pink_spectrum, n=len(white_noise))
+
+
+def legacy_lowpass_filter(audio, cutoff=200, sample_rate=44100):
+    nyquist = sample_rate / 2
+    b, a = signal.butter(4, cutoff / nyquist, btype='low')
+    return signal.filtfilt(b, a, audio)
+
+
+def legacy_bandpass_filter(audio, low=100, high=8000, sample_rate=44100):
+    nyquist = sample_rate / 2
+    b, a = signal.butter(3, [low / nyquist, high / nyquist], btype='band')
+    return signal.filtfilt(b, a, audio)
+
+
+# ==================== BENCHMARK ====================
+
+def measure(func, audio):
+    """Return (seconds, peak MB allocated on top of the input)"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    func(audio)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 1e6
+
+
+def run_benchmark(duration_seconds=300, sample_rate=44100):
+    audio = np.random.default_rng(0).standard_normal(int(duration_seconds * sample_rate))
+    input_mb = audio.nbytes / 1e6
+
+    print(f"\n{duration_seconds}s of audio ({len(audio):,} samples, {input_mb:.0f} MB input)\n")
+    print(f"{'helper':<10} {'old s':>8} {'new s':>8} {'speedup':>8} {'old MB':>8} {'new MB':>8}")
+
+    pairs = [
+        ("pink", legacy_pink_filter, apply_pink_filter),
+        ("lowpass", legacy_lowpass_filter, apply_lowpass_filter),
+        ("bandpass", legacy_bandpass_filter, apply_bandpass_filter),
+    ]
+    for name, old, new in pairs:
+        new(audio[:sample_rate])  # warm the design cache outside the timing
+        old_s, old_mb = measure(old, audio)
+        new_s, new_mb = measure(new, audio)
+        print(f"{name:<10} {old_s:>8.2f} {new_s:>8.2f} {old_s / new_s:>7.1f}x {old_mb:>8.0f} {new_mb:>8.0f}")
+
+
+if __name__ == "__main__":
+    run_benchmark(float(sys.argv[1]) if len(sys.argv) > 1 else 300)
@@ -0,0 +1,135 @@
+"""
+Benchmark throughput and per-worker memory of app.serve for several worker counts.
+
+Usage: python -m scripts.benchmark_workers [worker counts, default 1 2 4]
+
+Each run starts the server, drives it with concurrent clients (user analysis
+plus a bowl sequence stream) and reads worker memory from /proc (Linux only).
+USS is memory private to a worker; shared assets show up in RSS and are
+split between workers in PSS.
+"""
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+
+CLIENTS = 8
+SECONDS = 15
+
+ANALYZE_PAYLOAD = json.dumps({"users": [{
+    "uid": "bench",
+    "dailyCheckIns": [{
+        "energy": {"stressed": 7, "focused": 4, "calm": 3, "tired": 6},
+        "sleepQuality": {"sleep_quality": 3, "sleep_duration_hours": 5.5},
+    }] * 7,
+}]}).encode()
+
+
+# ==================== SERVER ====================
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(workers, port):
+    env = dict(os.environ, WEB_CONCURRENCY=str(workers), PORT=str(port), HOST="127.0.0.1")
+    server = subprocess.Popen([sys.executable, "-m", "app.serve"], env=env,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1)
+            return server
+        except OSError:
+            time.sleep(0.5)
+    server.kill()
+    raise RuntimeError("server did not start")
+
+
+def child_pids(pid):
+    pids = []
+    for task in os.listdir(f"/proc/{pid}/task"):
+        with open(f"/proc/{pid}/task/{task}/children") as f:
+            for child in f.read().split():
+                pids.append(int(child))
+                pids.extend(child_pids(int(child)))
+    return pids
+
+
+def worker_pids(server_pid):
+    """Spawned uvicorn workers, or the server itself when it runs a single worker"""
+    workers = []
+    for pid in child_pids(server_pid):
+        with open(f"/proc/{pid}/cmdline", "rb") as f:
+            if b"spawn_main" in f.read():
+                workers.append(pid)
+    return workers or [server_pid]
+
+
+def memory_mb(pid):
+    """RSS, PSS and USS of a process in MB"""
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                fields[parts[0].rstrip(":")] = int(parts[1]) / 1024
+    uss = fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0)
+    return fields.get("Rss", 0), fields.get("Pss", 0), uss
+
+
+# ==================== LOAD ====================
+
+def run_clients(port, seconds=SECONDS, clients=CLIENTS):
+    """Return completed requests per second"""
+    base = f"http://127.0.0.1:{port}"
+    done = []
+    stop_at = time.time() + seconds
+
+    def client(i):
+        count = 0
+        while time.time() < stop_at:
+            if (count + i) % 2:
+                request = urllib.request.Request(f"{base}/analyze-user", data=ANALYZE_PAYLOAD,
+                                                 headers={"Content-Type": "application/json"})
+            else:
+                request = f"{base}/meditation/sequence?format=wav&duration=30"
+            with urllib.request.urlopen(request, timeout=60) as response:
+                response.read()
+            count += 1
+        done.append(count)
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return sum(done) / seconds
+
+
+def run_benchmark(worker_counts=(1, 2, 4)):
+    print(f"\n{CLIENTS} clients for {SECONDS}s per run, {os.cpu_count()} CPUs\n")
+    print(f"{'workers':>7} {'req/s':>8} {'RSS MB':>8} {'PSS MB':>8} {'USS MB':>8}   (per worker)")
+
+    for workers in worker_counts:
+        port = free_port()
+        server = start_server(workers, port)
+        try:
+            throughput = run_clients(port)
+            pids = worker_pids(server.pid)
+            stats = [memory_mb(pid) for pid in pids]
+            rss, pss, uss = (sum(s[i] for s in stats) / len(stats) for i in range(3))
+            print(f"{workers:>7} {throughput:>8.1f} {rss:>8.0f} {pss:>8.0f} {uss:>8.0f}")
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    run_benchmark([int(n) for n in sys.argv[1:]] or (1, 2, 4))
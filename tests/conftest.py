@@ -0,0 +1,11 @@
+import pytest
+
+from app import assets
+from config import settings
+
+
+@pytest.fixture(autouse=True)
+def asset_dir(tmp_path, monkeypatch):
+    """Keep shared assets from other runs on this host out of the tests"""
+    monkeypatch.setattr(settings, "ASSET_DIR", str(tmp_path / "assets"))
+    monkeypatch.delenv(assets.PREPARED_ENV, raising=False)
@@ -0,0 +1,128 @@
+import asyncio
+import io
+
+import httpx
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+client = TestClient(app)
+
+
+def test_health():
+    response = client.get("/health")
+    assert response.status_code == 200
+    assert response.json()["status"] == "ok"
+
+
+# ==================== MEDITATION STREAMING ====================
+
+def test_unknown_track_is_404():
+    assert client.get("/meditation/thunder").status_code == 404
+
+
+def test_too_short_duration_is_rejected():
+    for audio_format in ("wav", "ogg"):
+        response = client.get("/meditation/bowl", params={"duration": 0.01, "format": audio_format})
+        assert response.status_code == 422
+
+
+def _wav_samples(body):
+    return np.frombuffer(body[44:], dtype="<i2")
+
+
+def test_flac_stream_decodes_to_the_wav_samples():
+    sf = pytest.importorskip("soundfile")
+    params = {"duration": 12, "seed": 3}
+    wav = client.get("/meditation/mix", params={**params, "format": "wav"}).content
+    flac = client.get("/meditation/mix", params={**params, "format": "flac"})
+
+    assert flac.headers["content-type"] == "audio/flac"
+    samples, sample_rate = sf.read(io.BytesIO(flac.content), dtype="int16")
+    assert sample_rate == 44100
+    assert np.array_equal(samples, _wav_samples(wav))
+
+
+def test_flac_stream_seeks_with_start():
+    sf = pytest.importorskip("soundfile")
+    params = {"duration": 12, "seed": 3}
+    wav = client.get("/meditation/rain", params={**params, "format": "wav"}).content
+    flac = client.get("/meditation/rain", params={**params, "format": "flac", "start": 2.5}).content
+
+    samples, _ = sf.read(io.BytesIO(flac), dtype="int16")
+    assert np.array_equal(samples, _wav_samples(wav)[int(2.5 * 44100):])
+
+
+def test_ogg_stream_decodes():
+    sf = pytest.importorskip("soundfile")
+    ogg = client.get("/meditation/sequence", params={"duration": 12, "format": "ogg"}).content
+
+    samples, _ = sf.read(io.BytesIO(ogg), dtype="int16")
+    assert len(samples) == 12 * 44100
+
+
+# ==================== RANGE REQUESTS ====================
+
+RANGE_PARAMS = {"duration": 25, "seed": 1, "format": "wav"}
+WAV_SIZE = 44 + 25 * 44100 * 2
+
+
+@pytest.fixture(scope="module")
+def full_wav():
+    response = client.get("/meditation/mix", params=RANGE_PARAMS)
+    assert response.status_code == 200
+    assert response.headers["accept-ranges"] == "bytes"
+    assert len(response.content) == int(response.headers["content-length"]) == WAV_SIZE
+    return response.content
+
+
+def _get_range(range_header):
+    if isinstance(range_header, bytes):
+        # TestClient re-encodes header values as UTF-8; send raw bytes straight to the app
+        async def get():
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as raw_client:
+                return await raw_client.get("/meditation/mix", params=RANGE_PARAMS,
+                                            headers={"Range": range_header})
+        return asyncio.run(get())
+    return client.get("/meditation/mix", params=RANGE_PARAMS, headers={"Range": range_header})
+
+
+@pytest.mark.parametrize("range_header, first, last", [
+    ("bytes=1000-1999", 1000, 1999),                       # a-b
+    ("bytes=-500", WAV_SIZE - 500, WAV_SIZE - 1),          # last n bytes
+    ("bytes=-99999999", 0, WAV_SIZE - 1),                  # suffix longer than the file
+    ("bytes=1500000-", 1500000, WAV_SIZE - 1),             # n- across chunk boundaries
+    ("bytes=44101-44200", 44101, 44200),                   # odd start byte (mid-sample)
+    ("bytes=10-30", 10, 30),                               # inside the header
+    ("bytes=40-47", 40, 47),                               # header into the first samples
+    ("bytes=2000000-99999999", 2000000, WAV_SIZE - 1),     # end past the file is clamped
+])
+def test_range_returns_matching_slice(full_wav, range_header, first, last):
+    response = _get_range(range_header)
+
+    assert response.status_code == 206
+    assert response.headers["content-range"] == f"bytes {first}-{last}/{WAV_SIZE}"
+    assert int(response.headers["content-length"]) == last - first + 1
+    assert response.content == full_wav[first:last + 1]
+
+
+@pytest.mark.parametrize("range_header", ["bytes=99999999-", f"bytes={WAV_SIZE}-", "bytes=-0"])
+def test_unsatisfiable_range_is_416(range_header):
+    response = _get_range(range_header)
+
+    assert response.status_code == 416
+    assert response.headers["content-range"] == f"bytes */{WAV_SIZE}"
+
+
+@pytest.mark.parametrize("range_header", [
+    "items=0-10", "bytes=abc", "bytes=20-10", "bytes=--5",
+    b"bytes=\xb2-", b"bytes=-\xb2",  # latin-1 superscript two: isdigit() but not ASCII
+])
+def test_ignored_range_sends_whole_file(full_wav, range_header):
+    response = _get_range(range_header)
+
+    assert response.status_code == 200
+    assert response.content == full_wav
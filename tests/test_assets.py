@@ -0,0 +1,19 @@
+import numpy as np
+
+from app import assets
+
+
+def test_unprepared_assets_are_ignored():
+    assets.store_array("table", np.arange(10.0))
+    assert assets.shared_array("table") is None
+
+
+def test_stored_array_is_mapped_read_only(monkeypatch):
+    monkeypatch.setenv(assets.PREPARED_ENV, "1")
+    assert assets.shared_array("table") is None
+
+    assets.store_array("table", np.arange(10.0))
+    table = assets.shared_array("table")
+    assert isinstance(table, np.memmap)
+    assert not table.flags.writeable
+    assert np.array_equal(table, np.arange(10.0))
@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+from scipy import signal
+
+from app.filters import BlockFilter, PinkFilter, butter_sos, filter_in_blocks
+
+SAMPLE_RATE = 44100
+
+
+@pytest.fixture(scope="module")
+def white():
+    return np.random.default_rng(0).standard_normal(2 ** 18)
+
+
+def test_butter_sos_is_cached_and_read_only():
+    sos = butter_sos(4, 200, SAMPLE_RATE, "low")
+    assert butter_sos(4, 200, SAMPLE_RATE, "low") is sos
+    assert butter_sos(4, 300, SAMPLE_RATE, "low") is not sos
+    assert not sos.flags.writeable
+
+
+@pytest.mark.parametrize("order, cutoff, btype", [(4, 200, "low"), (3, (100, 8000), "band")])
+def test_block_filter_matches_whole_signal(white, order, cutoff, btype):
+    sos = butter_sos(order, cutoff, SAMPLE_RATE, btype)
+    expected = signal.sosfilt(np.array(sos), white)
+
+    # Uneven block sizes, including one that is not a divisor of the length
+    assert np.array_equal(filter_in_blocks(BlockFilter(sos), white, block_size=10007), expected)
+    assert np.array_equal(filter_in_blocks(BlockFilter(sos), white, block_size=len(white)), expected)
+
+
+def test_pink_filter_keeps_state_across_blocks(white):
+    whole = PinkFilter()(white)
+    for block_size in (1000, 4096, 10007):
+        assert np.array_equal(filter_in_blocks(PinkFilter(), white, block_size=block_size), whole)
+
+
+def test_pink_filter_falls_3db_per_octave(white):
+    frequencies, power = signal.welch(PinkFilter()(white), SAMPLE_RATE, nperseg=8192)
+    band = (frequencies >= 50) & (frequencies <= 10000)
+    slope = np.polyfit(np.log2(frequencies[band]), 10 * np.log10(power[band]), 1)[0]
+    assert slope == pytest.approx(-3.01, abs=0.3)
@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+from scipy.io import wavfile
+
+from app.med import (
+    RAIN_CHUNK_BLOCKS, generate_bowl_sequence, iter_rain_blocks, render_rain, render_singing_bowl,
+)
+from app.med_stream import RAIN_LEVEL, rain_blocks, sequence_blocks, to_pcm16
+
+SAMPLE_RATE = 44100
+DURATION = 25  # 25 one-second blocks, i.e. two full chunks and a partial one
+
+
+@pytest.fixture(scope="module")
+def rain():
+    return render_rain(DURATION, SAMPLE_RATE, seed=7)
+
+
+def test_same_seed_renders_identical_rain(rain):
+    assert np.array_equal(render_rain(DURATION, SAMPLE_RATE, seed=7), rain)
+
+
+def test_different_seeds_render_different_rain(rain):
+    assert not np.array_equal(render_rain(DURATION, SAMPLE_RATE, seed=8), rain)
+
+
+def test_generator_seed_is_reproducible():
+    first = render_rain(5, SAMPLE_RATE, seed=np.random.default_rng(3))
+    second = render_rain(5, SAMPLE_RATE, seed=np.random.default_rng(3))
+    assert np.array_equal(first, second)
+
+
+def test_parallel_render_matches_serial(rain):
+    assert np.array_equal(render_rain(DURATION, SAMPLE_RATE, seed=7, workers=3), rain)
+
+
+@pytest.mark.parametrize("first_block", [1, RAIN_CHUNK_BLOCKS - 1, RAIN_CHUNK_BLOCKS, RAIN_CHUNK_BLOCKS + 3])
+def test_rain_from_block_matches_full_render(rain, first_block):
+    blocks = np.concatenate(list(iter_rain_blocks(DURATION, SAMPLE_RATE, seed=7, first_block=first_block)))
+    assert np.array_equal(blocks, rain[first_block * SAMPLE_RATE:])
+
+
+@pytest.mark.parametrize("duration", [20, 60, 150])
+def test_streamed_rain_level_matches_generated_file(duration):
+    # generate_rain_sound normalizes its peak to RAIN_LEVEL; short tracks never finish fading in
+    peak = np.abs(np.concatenate(list(rain_blocks(duration, SAMPLE_RATE, seed=2)))).max()
+    assert RAIN_LEVEL / 1.5 < peak < RAIN_LEVEL * 1.5
+
+
+def test_singing_bowl_seed_is_reproducible():
+    assert np.array_equal(render_singing_bowl(3, seed=1), render_singing_bowl(3, seed=1))
+    assert not np.array_equal(render_singing_bowl(3, seed=1), render_singing_bowl(3, seed=2))
+
+
+def test_bowl_shorter_than_attack_renders():
+    assert len(render_singing_bowl(0.01, seed=0)) == 441
+
+
+@pytest.mark.parametrize("bowl_type", ["tibetan", "crystal"])
+def test_streamed_sequence_matches_generated_file(tmp_path, bowl_type):
+    path = str(tmp_path / "sequence.wav")
+    generate_bowl_sequence(40, interval=15, bowl_type=bowl_type, output_file=path)
+    _, from_file = wavfile.read(path)
+
+    streamed = np.concatenate(list(sequence_blocks(40, SAMPLE_RATE, interval=15, bowl_type=bowl_type)))
+    assert np.array_equal(to_pcm16(streamed), from_file)